@@ -3,19 +3,28 @@ FastAPI server for water demand forecasting ML model
 Includes: model serving, validation, error handling, CORS, logging, caching
 """
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict
+from typing import List, Literal, Optional, Dict
 import pickle
 import numpy as np
 import logging
 from datetime import datetime, timedelta
-from functools import lru_cache
+from functools import lru_cache, wraps
+import asyncio
+from collections import deque
+import hashlib
+import os
+import threading
 import time
+import zlib
 import uvicorn
 
+from intervals import INTERVAL_MAX_HORIZON, SCARCITY_LEVELS, build_interval_table
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -50,11 +59,57 @@ app.add_middleware(
 cache_store = {}
 CACHE_TTL = 3600  # 1 hour
 
+# Cache snapshot (restored on startup so the cache is warm after a restart)
+MODEL_VERSION = "1.0.0"
+MODEL_PATH = 'models/water_demand_model.pkl'
+DATA_PATH = 'models/cleaned_global_water_consumption.csv'
+CACHE_SNAPSHOT_PATH = 'models/forecast_cache.snapshot'
+CACHE_SNAPSHOT_INTERVAL = 300  # seconds
+CACHE_SNAPSHOT_MAGIC = b'AQFC1'
+
+# Prediction intervals (empirical residual quantiles, exported alongside the model)
+INTERVALS_PATH = 'models/water_demand_intervals.pkl'
+
 # Request tracking for rate limiting
 request_tracker = {}
 RATE_LIMIT = 100  # requests per minute
 RATE_WINDOW = 60  # seconds
 
+# Adaptive admission control for forecast computations (cache misses only)
+ADMISSION_INITIAL_LIMIT = 8  # concurrent computations
+ADMISSION_MIN_LIMIT = 1
+ADMISSION_MAX_LIMIT = 64
+ADMISSION_TARGET_LATENCY = 0.5  # seconds per computation before the limit backs off
+ADMISSION_BACKOFF = 0.9  # multiplicative decrease when over target
+ADMISSION_MAX_WAIT = 0.25  # seconds a request may queue for a slot before being shed
+
+# Feature overrides the trend-based fallback engine honours
+FALLBACK_FEATURES = ('total_water_consumption', 'water_scarcity_level')
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# CSV columns, keyed by the baseline feature names used in the API
+CSV_COLUMNS = {
+    'total_water_consumption': 'Total Water Consumption (Billion Cubic Meters)',
+    'per_capita_water_use': 'Per Capita Water Use (Liters per Day)',
+    'agricultural_water_use': 'Agricultural Water Use (%)',
+    'industrial_water_use': 'Industrial Water Use (%)',
+    'household_water_use': 'Household Water Use (%)',
+    'rainfall_impact': 'Rainfall Impact (Annual Precipitation in mm)',
+    'groundwater_depletion_rate': 'Groundwater Depletion Rate (%)',
+    'water_scarcity_level': 'Water Scarcity Level',
+}
+
+# Per-country data keyed by lowercase country name (built at load, updated on ingest)
+country_index = {}
+country_index_lock = threading.Lock()
+
+# Historical series slices served by /api/history, keyed by (country, start, end, columns)
+history_cache = {}
+HISTORY_CACHE_SIZE = 1024
+HISTORY_MAX_REGIONS = 20
+
 # Country/Region specific baseline data
 REGION_DATA = {
     'india': {
@@ -188,6 +243,7 @@ class ForecastRequest(BaseModel):
     region: str = Field(..., min_length=2, max_length=100, description="Region name (state, district, or city)")
     months_ahead: int = Field(default=6, ge=1, le=24, description="Number of months to forecast")
     include_confidence: bool = Field(default=True, description="Include confidence intervals")
+    confidence_level: float = Field(default=0.95, ge=0.5, le=0.99, description="Confidence level of the intervals")
     features: Optional[Dict[str, float]] = Field(default=None, description="Optional additional features")
     
     @validator('region')
@@ -230,32 +286,80 @@ class ForecastResponse(BaseModel):
     metadata: Dict
 
 
+class IngestRow(BaseModel):
+    """One year of observations for a country (same fields as the CSV)"""
+    country: str = Field(..., min_length=2, max_length=100)
+    year: int = Field(..., ge=1900, le=2100)
+    total_water_consumption: float = Field(..., ge=0)
+    per_capita_water_use: float = Field(..., ge=0)
+    agricultural_water_use: float = Field(..., ge=0, le=100)
+    industrial_water_use: float = Field(..., ge=0, le=100)
+    household_water_use: float = Field(..., ge=0, le=100)
+    rainfall_impact: float = Field(..., ge=0)
+    groundwater_depletion_rate: float
+    water_scarcity_level: Literal['Low', 'Moderate', 'High']
+    
+    @validator('country')
+    def validate_country(cls, v):
+        """Validate country name format"""
+        if not v.strip():
+            raise ValueError('Country cannot be empty')
+        return v.strip()
+
+
+class IngestRequest(BaseModel):
+    """Input validation for dataset ingestion"""
+    rows: List[IngestRow] = Field(..., min_length=1, max_length=1000)
+
+
 # ============================================
 # MODEL LOADING AND CACHING
 # ============================================
 
-@lru_cache(maxsize=1)
+def load_once(loader):
+    """
+    lru_cache(maxsize=1) for zero-argument loaders that is also thread-safe:
+    concurrent callers wait for a load in progress instead of repeating it.
+    `peek()` returns the loaded value (None if not loaded yet) without ever blocking.
+    """
+    state = {}
+    lock = threading.Lock()
+    
+    @wraps(loader)
+    def wrapper():
+        if 'value' not in state:
+            with lock:
+                if 'value' not in state:
+                    state['value'] = loader()
+        return state['value']
+    
+    wrapper.cache_clear = lambda: state.pop('value', None)
+    wrapper.peek = lambda: state.get('value')
+    return wrapper
+
+
+@load_once
 def load_model():
     """Load ML model (cached in memory)"""
     try:
-        with open('models/water_demand_model.pkl', 'rb') as f:
+        with open(MODEL_PATH, 'rb') as f:
             model = pickle.load(f)
         logger.info("Model loaded successfully")
         return model
     except FileNotFoundError:
-        logger.error("Model file not found. Using mock predictions.")
+        logger.error("Model file not found. Using fallback forecasts.")
         return None
     except Exception as e:
         logger.error(f"Error loading model: {e}")
         return None
 
 
-@lru_cache(maxsize=1)
+@load_once
 def load_country_data():
     """Load historical country water consumption data from CSV"""
     try:
         import pandas as pd
-        df = pd.read_csv('models/cleaned_global_water_consumption.csv')
+        df = pd.read_csv(DATA_PATH)
         logger.info(f"Country data loaded: {len(df)} records, {df['Country'].nunique()} countries")
         return df
     except Exception as e:
@@ -263,41 +367,99 @@ def load_country_data():
         return None
 
 
-def get_country_baseline(country_name: str, df=None):
+def baseline_from_row(row) -> Dict[str, float]:
+    """Convert one CSV row into the baseline feature dict used by the model"""
+    baseline = {key: float(row[column]) for key, column in CSV_COLUMNS.items()
+                if key != 'water_scarcity_level'}
+    baseline['water_scarcity_level'] = SCARCITY_LEVELS.get(row[CSV_COLUMNS['water_scarcity_level']], 0.0)
+    return baseline
+
+
+def fit_consumption_trend(rows) -> Dict[str, float]:
+    """Least-squares linear trend of total consumption over the years (for the fallback engine)"""
+    years = rows['Year'].to_numpy(dtype=float)
+    values = rows[CSV_COLUMNS['total_water_consumption']].to_numpy(dtype=float)
+    
+    if len(years) < 2:
+        return {'slope': 0.0, 'intercept': float(values[-1]), 'last_year': float(years[-1])}
+    
+    slope, intercept = np.polyfit(years, values, 1)
+    return {'slope': float(slope), 'intercept': float(intercept), 'last_year': float(years[-1])}
+
+
+def build_history_arrays(rows) -> Dict:
+    """Year-sorted column arrays for fast range slicing"""
+    columns = {
+        key: rows[column].to_numpy(dtype=float)
+        for key, column in CSV_COLUMNS.items() if key != 'water_scarcity_level'
+    }
+    columns['water_scarcity_level'] = (rows[CSV_COLUMNS['water_scarcity_level']]
+                                       .map(SCARCITY_LEVELS).fillna(0.0).to_numpy())
+    return {'years': rows['Year'].to_numpy(dtype=int), 'columns': columns}
+
+
+def build_country_entry(rows) -> Dict:
+    """Build the in-memory entry for one country from its CSV rows"""
+    rows = (rows.drop_duplicates('Year', keep='last')
+                .sort_values('Year')
+                .reset_index(drop=True))
+    return {
+        'name': rows['Country'].mode().iloc[0],  # most common spelling
+        'rows': rows,
+        'baseline': baseline_from_row(rows.iloc[-1]),
+        'trend': fit_consumption_trend(rows),
+        'history': build_history_arrays(rows),
+    }
+
+
+def get_country_index() -> Dict[str, Dict]:
+    """Per-country data keyed by lowercase name (built from the CSV on first use)"""
+    if not country_index:
+        with country_index_lock:
+            if not country_index:
+                df = load_country_data()
+                if df is not None:
+                    # Build privately and publish in one step so readers never see a partial index.
+                    # Group case-insensitively so "India" and "india" rows merge.
+                    built = {key: build_country_entry(rows)
+                             for key, rows in df.groupby(df['Country'].str.lower())}
+                    country_index.update(built)
+    return country_index
+
+
+def resolve_country(region: str) -> Optional[str]:
+    """Map a region name to a country index key (None if there is no match)"""
+    index = get_country_index()
+    key = region.lower().strip()
+    
+    # Try exact match first
+    if key in index:
+        return key
+    
+    # If no exact match, try partial match (iterate a snapshot - ingestion may add keys)
+    for name in list(index):
+        if key in name:
+            return name
+    
+    return None
+
+
+def get_country_baseline(country_name: str):
     """Get the most recent data for a country from the CSV"""
-    if df is None:
-        df = load_country_data()
+    index = get_country_index()
     
-    if df is None:
+    if not index:
         logger.warning(f"CSV data not available. Using defaults for {country_name}")
         return REGION_DATA.get('default')
     
-    # Try exact match first
-    country_data = df[df['Country'].str.lower() == country_name.lower()]
-    
-    # If no exact match, try partial match
-    if country_data.empty:
-        country_data = df[df['Country'].str.lower().str.contains(country_name.lower(), na=False)]
+    country_key = resolve_country(country_name)
     
     # If still no match, use default
-    if country_data.empty:
+    if country_key is None:
         logger.warning(f"No data found for country: {country_name}. Using defaults.")
         return REGION_DATA.get('default')
     
-    # Get most recent year data
-    recent_data = country_data.sort_values('Year', ascending=False).iloc[0]
-    
-    baseline = {
-        'total_water_consumption': float(recent_data['Total Water Consumption (Billion Cubic Meters)']),
-        'per_capita_water_use': float(recent_data['Per Capita Water Use (Liters per Day)']),
-        'agricultural_water_use': float(recent_data['Agricultural Water Use (%)']),
-        'industrial_water_use': float(recent_data['Industrial Water Use (%)']),
-        'household_water_use': float(recent_data['Household Water Use (%)']),
-        'rainfall_impact': float(recent_data['Rainfall Impact (Annual Precipitation in mm)']),
-        'groundwater_depletion_rate': float(recent_data['Groundwater Depletion Rate (%)']),
-        'water_scarcity_level': 2.0 if recent_data['Water Scarcity Level'] == 'High' else 
-                                1.0 if recent_data['Water Scarcity Level'] == 'Moderate' else 0.0,
-    }
+    baseline = dict(index[country_key]['baseline'])
     
     logger.info(f"Loaded baseline for {country_name}: consumption={baseline['total_water_consumption']:.2f} BCM, "
                 f"per_capita={baseline['per_capita_water_use']:.1f} L/day")
@@ -305,6 +467,229 @@ def get_country_baseline(country_name: str, df=None):
     return baseline
 
 
+def ingest_country_rows(rows) -> List[str]:
+    """
+    Append new observations to the CSV and the in-memory country index.
+    Only the countries present in `rows` are rebuilt; returns their index keys.
+    """
+    import pandas as pd
+    
+    index = get_country_index()
+    
+    # Keep the existing spelling of each country (or the first spelling of a new one),
+    # so the CSV never holds the same country under two names
+    keys = rows['Country'].str.lower()
+    canonical = {key: index[key]['name'] if key in index else name
+                 for key, name in zip(keys[::-1], rows['Country'][::-1])}
+    rows = rows.assign(Country=keys.map(canonical))
+    
+    with country_index_lock:
+        # Rebuild the entries first - if that fails, neither the CSV nor memory has changed
+        rebuilt = {}
+        for name, new_rows in rows.groupby('Country'):
+            key = name.lower()
+            existing = index.get(key)
+            if existing is not None:
+                new_rows = pd.concat([existing['rows'], new_rows], ignore_index=True)
+            rebuilt[key] = build_country_entry(new_rows)
+        
+        # Persist so a restart sees the same data (duplicate years resolve to the last row)
+        rows.to_csv(DATA_PATH, mode='a', header=False, index=False)
+        index.update(rebuilt)
+    
+    get_cache_versions.cache_clear()
+    affected = list(rebuilt)
+    
+    # Intervals derived from the dataset are stale now - rebuild them on next use
+    interval_table = load_interval_table.peek()
+    if interval_table is not None and interval_table['source'] == 'dataset':
+        load_interval_table.cache_clear()
+    
+    logger.info(f"Ingested {len(rows)} rows for {len(affected)} countries: {affected}")
+    return affected
+
+
+def invalidate_cache_for_countries(country_keys: List[str], include_unmatched: bool = False) -> int:
+    """Drop cached forecasts and history slices computed from the given countries' data"""
+    stale = [
+        key for key, entry in list(cache_store.items())
+        if entry.get('country') in country_keys
+        or (include_unmatched and entry.get('country') is None)
+    ]
+    for key in stale:
+        cache_store.pop(key, None)
+    
+    # Historical slices for these countries are stale too
+    for key in [key for key in list(history_cache) if key[0] in country_keys]:
+        history_cache.pop(key, None)
+    
+    logger.info(f"Invalidated {len(stale)} cache entries for {country_keys}")
+    return len(stale)
+
+
+def get_history_slice(country_key: str, start_year: Optional[int], end_year: Optional[int],
+                      columns: tuple, max_points: Optional[int] = None) -> Dict:
+    """
+    Slice a country's history by year range (binary search), cached per query.
+    With max_points, consecutive years are averaged into equal buckets
+    labelled by their first year.
+    """
+    cache_key = (country_key, start_year, end_year, columns, max_points)
+    cached = history_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    entry = country_index[country_key]
+    history = entry['history']
+    years = history['years']
+    lo = 0 if start_year is None else int(np.searchsorted(years, start_year, side='left'))
+    hi = len(years) if end_year is None else int(np.searchsorted(years, end_year, side='right'))
+    
+    series = {column: history['columns'][column][lo:hi] for column in columns}
+    years = years[lo:hi]
+    
+    if max_points is not None and len(years) > max_points:
+        bucket_size = -(-len(years) // max_points)  # ceil division
+        starts = np.arange(0, len(years), bucket_size)
+        counts = np.diff(np.append(starts, len(years)))
+        series = {column: np.add.reduceat(values, starts) / counts for column, values in series.items()}
+        years = years[starts]
+    
+    result = {
+        "region": entry['name'],
+        "years": years.tolist(),
+        **{column: values.tolist() for column, values in series.items()}
+    }
+    
+    # Bounded cache - drop the oldest entry when full
+    if len(history_cache) >= HISTORY_CACHE_SIZE:
+        history_cache.pop(next(iter(history_cache)), None)
+    history_cache[cache_key] = result
+    return result
+
+
+# ============================================
+# PREDICTION INTERVALS
+# ============================================
+
+def derive_interval_table_from_dataset() -> Optional[Dict]:
+    """Fallback interval table from persistence-forecast residuals in the CSV"""
+    residuals, horizons, scarcity_levels = [], [], []
+    
+    for entry in get_country_index().values():
+        rows = entry['rows']
+        values = rows[CSV_COLUMNS['total_water_consumption']].to_numpy(dtype=float)
+        scarcity = rows[CSV_COLUMNS['water_scarcity_level']].map(SCARCITY_LEVELS).fillna(0.0).to_numpy()
+        
+        for h in range(1, min(INTERVAL_MAX_HORIZON, len(values) - 1) + 1):
+            residuals.append(values[h:] / values[:-h] - 1)
+            horizons.append(np.full(len(values) - h, h))
+            scarcity_levels.append(scarcity[:-h])
+    
+    if not residuals:
+        return None
+    
+    return build_interval_table(np.concatenate(residuals), np.concatenate(horizons), np.concatenate(scarcity_levels))
+
+
+@load_once
+def load_interval_table() -> Optional[Dict]:
+    """Load the interval table exported with the model (cached in memory)"""
+    try:
+        with open(INTERVALS_PATH, 'rb') as f:
+            table = pickle.load(f)
+        table['source'] = 'model'
+        logger.info("Interval table loaded successfully")
+        return table
+    except FileNotFoundError:
+        logger.warning("Interval table not found. Deriving intervals from the dataset.")
+    except Exception as e:
+        logger.error(f"Error loading interval table: {e}. Deriving intervals from the dataset.")
+    
+    table = derive_interval_table_from_dataset()
+    if table is not None:
+        table['source'] = 'dataset'
+    return table
+
+
+def interval_bounds(demand: np.ndarray, horizons: np.ndarray, scarcity_level: float, confidence_level: float):
+    """
+    Vectorized lower/upper bounds for a forecast (one value per month ahead).
+    `horizons` are years since the last observed year, as the table is keyed.
+    """
+    table = load_interval_table()
+    if table is None:
+        # No residuals available at all - keep the old +/-10% approximation
+        return demand * 0.90, demand * 1.10
+    
+    residuals = table['residuals']
+    h_idx = np.clip(np.asarray(horizons, dtype=int), 1, residuals.shape[0]) - 1
+    s_idx = int(np.argmin(np.abs(table['scarcity_levels'] - scarcity_level)))
+    rows = residuals[h_idx, s_idx]  # (months, quantiles)
+    
+    # Fractional position of the requested quantiles on the grid
+    alpha = (1 - confidence_level) / 2
+    grid_pos = np.arange(len(table['quantiles']))
+    bounds = []
+    for q in (alpha, 1 - alpha):
+        pos = np.interp(q, table['quantiles'], grid_pos)
+        lo = int(min(np.floor(pos), len(grid_pos) - 2))
+        weight = pos - lo
+        bounds.append(demand * (1 + rows[:, lo] * (1 - weight) + rows[:, lo + 1] * weight))
+    
+    return bounds[0], bounds[1]
+
+
+def get_scarcity_level(region: str, features: Optional[Dict] = None) -> float:
+    """Scarcity level used to pick the interval row for a region"""
+    if features and 'water_scarcity_level' in features:
+        return float(features['water_scarcity_level'])
+    
+    country_key = resolve_country(region)
+    if country_key is None:
+        return REGION_DATA['default']['water_scarcity_level']
+    return country_index[country_key]['baseline']['water_scarcity_level']
+
+
+def get_last_observed_year(region: str) -> int:
+    """Last year of data behind a region's forecast (dataset end for unmatched regions)"""
+    country_key = resolve_country(region)
+    if country_key is not None:
+        return int(country_index[country_key]['trend']['last_year'])
+    
+    last_years = [entry['trend']['last_year'] for entry in list(country_index.values())]
+    return int(max(last_years)) if last_years else datetime.now().year - 1
+
+
+def build_forecast_points(demand, region: str, include_confidence: bool,
+                          confidence_level: float, features: Optional[Dict] = None):
+    """Turn an array of monthly demand values into forecast data points"""
+    demand = np.asarray(demand, dtype=float)
+    current_date = datetime.now()
+    
+    if include_confidence:
+        years, _ = forecast_calendar(len(demand))
+        horizons = years - get_last_observed_year(region)
+        lower, upper = interval_bounds(demand, horizons, get_scarcity_level(region, features), confidence_level)
+    
+    forecast_data = []
+    for i, value in enumerate(demand):
+        month_date = current_date + timedelta(days=30 * i)
+        
+        data_point = {
+            "month": month_date.strftime("%Y-%m"),
+            "demand_mld": round(float(value), 2)
+        }
+        
+        if include_confidence:
+            data_point["confidence_lower"] = round(float(lower[i]), 2)
+            data_point["confidence_upper"] = round(float(upper[i]), 2)
+        
+        forecast_data.append(data_point)
+    
+    return forecast_data
+
+
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
@@ -330,38 +715,54 @@ def check_rate_limit(client_ip: str) -> bool:
     return True
 
 
-def get_cache_key(region: str, months: int) -> str:
+def get_cache_key(region: str, months: int, confidence_level: float, include_confidence: bool = True,
+                  features: Optional[Dict[str, float]] = None) -> str:
     """Generate cache key - must include region to avoid mixing predictions"""
-    return f"{region.lower().strip()}_{months}"
+    # The level is echoed in the response, so it is part of the key even without intervals
+    key = f"{region.lower().strip()}_{months}_{confidence_level:g}"
+    if not include_confidence:
+        key += "_nointervals"
+    
+    # Feature overrides change the forecast - never share them with plain requests
+    if features:
+        digest = hashlib.sha1(repr(sorted(features.items())).encode()).hexdigest()[:12]
+        key += f"_f{digest}"
+    return key
 
 
-def generate_mock_forecast(region: str, months: int, include_confidence: bool):
-    """Generate mock forecast data (fallback when model not available)"""
-    base_demand = np.random.uniform(800, 1200)
-    trend = np.random.uniform(-0.5, 2.0)
+def forecast_calendar(months: int):
+    """Calendar year and month for each forecast step, starting this month"""
+    now = datetime.now()
+    month_index = now.month - 1 + np.arange(months)
+    return now.year + month_index // 12, month_index % 12 + 1
+
+
+def generate_fallback_forecast(region: str, months: int, include_confidence: bool,
+                               confidence_level: float = 0.95, features: Optional[Dict] = None):
+    """
+    Deterministic degraded-mode forecast (used when the model is unavailable).
+    Extrapolates the country's historical linear trend, fitted at load, with the
+    same seasonal profile the model features use. Only the FALLBACK_FEATURES
+    overrides apply: total_water_consumption re-anchors the trend level at the
+    last observed year, water_scarcity_level picks the interval row.
+    """
+    country_key = resolve_country(region)
+    if country_key is None:
+        trend = {'slope': 0.0, 'intercept': REGION_DATA['default']['total_water_consumption'],
+                 'last_year': float(datetime.now().year)}
+    else:
+        trend = country_index[country_key]['trend']
     
-    forecast_data = []
-    current_date = datetime.now()
+    if features and 'total_water_consumption' in features:
+        level = float(features['total_water_consumption'])
+        trend = {**trend, 'intercept': level - trend['slope'] * trend['last_year']}
     
-    for i in range(months):
-        month_date = current_date + timedelta(days=30 * i)
-        seasonal_factor = 1 + 0.15 * np.sin(2 * np.pi * month_date.month / 12)
-        noise = np.random.normal(0, 20)
-        
-        demand = base_demand + (trend * i) + (seasonal_factor * base_demand * 0.1) + noise
-        
-        data_point = {
-            "month": month_date.strftime("%Y-%m"),
-            "demand_mld": round(demand, 2)
-        }
-        
-        if include_confidence:
-            data_point["confidence_lower"] = round(demand * 0.9, 2)
-            data_point["confidence_upper"] = round(demand * 1.1, 2)
-        
-        forecast_data.append(data_point)
+    years, month_numbers = forecast_calendar(months)
+    seasonal_factor = 1 + 0.15 * np.sin(2 * np.pi * month_numbers / 12)
+    trend_value = trend['intercept'] + trend['slope'] * (years + (month_numbers - 1) / 12)
+    demand = np.maximum(trend_value, 0.0) * seasonal_factor
     
-    return forecast_data
+    return build_forecast_points(demand, region, include_confidence, confidence_level, features)
 
 
 def prepare_features(region: str, months: int, base_features: Optional[Dict] = None):
@@ -372,9 +773,6 @@ def prepare_features(region: str, months: int, base_features: Optional[Dict] = N
     - Industrial Water Use (%), Household Water Use (%), Rainfall Impact,
     - Groundwater Depletion Rate (%), and lag features (lag1, lag2, lag3, lag5)
     """
-    current_year = datetime.now().year
-    current_month = datetime.now().month
-    
     # Get actual country data from CSV
     region_baseline = get_country_baseline(region)
     
@@ -382,78 +780,343 @@ def prepare_features(region: str, months: int, base_features: Optional[Dict] = N
     if base_features:
         region_baseline = {**region_baseline, **base_features}
     
-    features_list = []
-    
     # For lag features, use the baseline consumption value
     baseline_consumption = region_baseline['total_water_consumption']
     
-    for i in range(months):
-        month_offset = current_month + i
-        future_year = current_year + (month_offset - 1) // 12
-        future_month = ((month_offset - 1) % 12) + 1
-        
-        # Apply trend and seasonality
-        year_trend = (future_year - current_year) * 0.02  # 2% annual growth
-        seasonal_factor = 1 + 0.15 * np.sin(2 * np.pi * future_month / 12)  # Seasonal variation
-        
-        # Projected consumption with trend
-        projected_consumption = baseline_consumption * (1 + year_trend) * seasonal_factor
-        
-        # Build feature vector matching training data
-        # Features from CSV: Year, Total Water Consumption, Per Capita, Agri%, Ind%, House%, Rainfall, Depletion%
-        # Plus lag features: lag1, lag2, lag3, lag5
-        feature_vector = [
-            region_baseline['per_capita_water_use'] * seasonal_factor,
-            region_baseline['agricultural_water_use'],
-            region_baseline['industrial_water_use'],
-            region_baseline['household_water_use'],
-            region_baseline['rainfall_impact'] * seasonal_factor,
-            region_baseline['groundwater_depletion_rate'],
-            projected_consumption,  # Current total water consumption
-            projected_consumption * 0.98,  # lag1 (slightly less)
-            projected_consumption * 0.96,  # lag2
-            projected_consumption * 0.94,  # lag3
-            projected_consumption * 0.90,  # lag5
-        ]
-        
-        features_list.append(feature_vector)
+    years, month_numbers = forecast_calendar(months)
+    
+    # Apply trend and seasonality
+    year_trend = (years - datetime.now().year) * 0.02  # 2% annual growth
+    seasonal_factor = 1 + 0.15 * np.sin(2 * np.pi * month_numbers / 12)  # Seasonal variation
+    
+    # Projected consumption with trend
+    projected_consumption = baseline_consumption * (1 + year_trend) * seasonal_factor
+    constant = np.ones(months)
     
-    return np.array(features_list)
+    # Build feature matrix matching training data
+    # Features from CSV: Year, Total Water Consumption, Per Capita, Agri%, Ind%, House%, Rainfall, Depletion%
+    # Plus lag features: lag1, lag2, lag3, lag5
+    return np.column_stack([
+        region_baseline['per_capita_water_use'] * seasonal_factor,
+        region_baseline['agricultural_water_use'] * constant,
+        region_baseline['industrial_water_use'] * constant,
+        region_baseline['household_water_use'] * constant,
+        region_baseline['rainfall_impact'] * seasonal_factor,
+        region_baseline['groundwater_depletion_rate'] * constant,
+        projected_consumption,  # Current total water consumption
+        projected_consumption * 0.98,  # lag1 (slightly less)
+        projected_consumption * 0.96,  # lag2
+        projected_consumption * 0.94,  # lag3
+        projected_consumption * 0.90,  # lag5
+    ])
 
 
-def predict_with_model(model, region: str, months: int, include_confidence: bool, features: Optional[Dict]):
+def predict_with_model(model, region: str, months: int, include_confidence: bool, features: Optional[Dict],
+                       confidence_level: float = 0.95):
     """Make predictions using the trained model"""
+    # Prepare feature matrix
+    X = prepare_features(region, months, features)
+    
+    # Get predictions from model
+    predictions = model.predict(X)
+    
+    # Build forecast data points (intervals from precomputed residual quantiles)
+    return build_forecast_points(predictions, region, include_confidence, confidence_level, features)
+
+
+def get_cached_forecast(cache_key: str) -> Optional[ForecastResponse]:
+    """Return a cached forecast if it has not expired"""
+    cached_result = cache_store.get(cache_key)
+    if cached_result and time.time() - cached_result['timestamp'] < CACHE_TTL:
+        return cached_result['data']
+    return None
+
+
+def compute_forecast(request: ForecastRequest, cache_key: str) -> ForecastResponse:
+    """Run the model (or fallback) for a request and cache the result"""
+    # Load model
+    model = load_model()
+    
+    # Generate predictions
+    forecast_data = None
+    if model:
+        try:
+            forecast_data = predict_with_model(
+                model,
+                request.region,
+                request.months_ahead,
+                request.include_confidence,
+                request.features,
+                request.confidence_level
+            )
+        except Exception as e:
+            logger.error(f"Model prediction error: {e}. Using fallback forecast.")
+    else:
+        logger.warning("Using fallback forecast (model not loaded)")
+    
+    degraded = forecast_data is None
+    if degraded:
+        forecast_data = generate_fallback_forecast(
+            request.region,
+            request.months_ahead,
+            request.include_confidence,
+            request.confidence_level,
+            request.features
+        )
+    
+    # Report only the overrides that actually shaped this forecast
+    features_used = list(request.features.keys()) if request.features else []
+    if degraded:
+        features_used = [name for name in features_used if name in FALLBACK_FEATURES]
+    
+    # Build response
+    response = ForecastResponse(
+        region=request.region,
+        forecast=forecast_data,
+        model_version=MODEL_VERSION,
+        generated_at=datetime.now().isoformat(),
+        confidence_level=request.confidence_level,
+        metadata={
+            "months_forecasted": request.months_ahead,
+            "features_used": features_used,
+            "degraded": degraded,
+            "cached": False
+        }
+    )
+    
+    # Cache result
+    cache_store[cache_key] = {
+        'timestamp': time.time(),
+        'data': response,
+        'country': resolve_country(request.region)
+    }
+    
+    return response
+
+
+# ============================================
+# CACHE PERSISTENCE
+# ============================================
+
+def file_fingerprint(path: str) -> Optional[str]:
+    """Short content hash of a file (None if the file is missing)"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()[:12]
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_cache_versions() -> Dict[str, Optional[str]]:
+    """Model and dataset versions that cached forecasts were computed against"""
+    return {
+        'model': f"{MODEL_VERSION}+{file_fingerprint(MODEL_PATH)}",
+        'dataset': file_fingerprint(DATA_PATH),
+        'intervals': file_fingerprint(INTERVALS_PATH),
+    }
+
+
+def save_cache_snapshot(path: str = CACHE_SNAPSHOT_PATH) -> int:
+    """Write unexpired cache entries to a compressed binary snapshot file"""
+    now = time.time()
+    entries = {
+        key: {**entry, 'data': entry['data'].model_dump()}
+        for key, entry in list(cache_store.items())
+        if now - entry['timestamp'] < CACHE_TTL
+    }
+    
+    # Nothing worth keeping - leave any existing snapshot alone
+    if not entries:
+        return 0
+    
+    snapshot = {'versions': get_cache_versions(), 'entries': entries}
+    payload = zlib.compress(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+    
+    # Write to a temp file first so a crash never leaves a truncated snapshot
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(CACHE_SNAPSHOT_MAGIC + payload)
+    os.replace(tmp_path, path)
+    
+    logger.info(f"Cache snapshot saved: {len(entries)} entries ({len(payload)} bytes)")
+    return len(entries)
+
+
+def restore_cache_snapshot(path: str = CACHE_SNAPSHOT_PATH) -> int:
+    """Load a cache snapshot, skipping expired entries and stale versions"""
     try:
-        # Prepare feature matrix
-        X = prepare_features(region, months, features)
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        logger.info("No cache snapshot found. Starting with a cold cache.")
+        return 0
+    
+    try:
+        if not raw.startswith(CACHE_SNAPSHOT_MAGIC):
+            raise ValueError("unrecognised snapshot header")
+        snapshot = pickle.loads(zlib.decompress(raw[len(CACHE_SNAPSHOT_MAGIC):]))
+    except Exception as e:
+        logger.error(f"Error reading cache snapshot: {e}")
+        return 0
+    
+    if snapshot.get('versions') != get_cache_versions():
+        logger.warning(
+            f"Cache snapshot discarded: versions {snapshot.get('versions')} "
+            f"do not match {get_cache_versions()}"
+        )
+        return 0
+    
+    entries = snapshot.get('entries', {})
+    now = time.time()
+    restored = 0
+    for key, entry in entries.items():
+        try:
+            if now - entry['timestamp'] >= CACHE_TTL:
+                continue
+            
+            # Never overwrite something computed since startup
+            current = cache_store.get(key)
+            if current and current['timestamp'] >= entry['timestamp']:
+                continue
+            
+            cache_store[key] = {**entry, 'data': ForecastResponse(**entry['data'])}
+            restored += 1
+        except Exception as e:
+            # e.g. the response schema changed since the snapshot was written
+            logger.warning(f"Skipping cache snapshot entry {key}: {e}")
+    
+    logger.info(f"Cache snapshot restored: {restored} of {len(entries)} entries")
+    return restored
+
+
+async def periodic_cache_snapshot():
+    """Snapshot the cache every CACHE_SNAPSHOT_INTERVAL seconds"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(CACHE_SNAPSHOT_INTERVAL)
+        try:
+            await loop.run_in_executor(None, save_cache_snapshot)
+        except Exception as e:
+            logger.error(f"Error saving cache snapshot: {e}")
+
+
+# ============================================
+# ADMISSION CONTROL
+# ============================================
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight forecast computations.
+    
+    The limit grows by ~1 per limit's worth of fast completions and shrinks
+    multiplicatively when a computation exceeds the target latency - at most
+    once per window, so completions that started before the last decrease
+    cannot cut it again. Requests that cannot get a slot within their wait
+    budget are shed instead of queued. Waiters are served first-in first-out:
+    a freed slot is handed directly to the oldest waiter.
+    """
+    
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int,
+                 target_latency: float, backoff: float):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.latency_ewma = None
+        self._last_decrease = 0.0
+        self._waiters = deque()
+    
+    def _has_slot(self) -> bool:
+        return self.in_flight < int(self.limit)
+    
+    def _admit(self):
+        self.in_flight += 1
+        self.admitted += 1
+    
+    async def acquire(self, max_wait: float) -> bool:
+        """Take a slot, waiting at most max_wait seconds (False means shed)"""
+        # Newcomers only skip the queue when nobody is waiting
+        if not self._waiters and self._has_slot():
+            self._admit()
+            return True
         
-        # Get predictions from model
-        predictions = model.predict(X)
+        # Shed up front if the queue ahead cannot drain within the wait budget
+        expected_wait = (len(self._waiters) + 1) / max(int(self.limit), 1) * (self.latency_ewma or 0.0)
+        if expected_wait > max_wait:
+            self.shed += 1
+            return False
         
-        # Build forecast data points
-        forecast_data = []
-        current_date = datetime.now()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, max_wait)
+            return True
+        except asyncio.TimeoutError:
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            # A slot handed over just before cancellation must not leak
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake_waiters()
+            raise
+        finally:
+            if waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+    
+    def _wake_waiters(self):
+        """Hand free slots to the oldest waiters (slot is counted on their behalf)"""
+        while self._waiters and self._has_slot():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._admit()
+                waiter.set_result(True)
+    
+    def release(self, started_at: float, computed: bool = True):
+        """Free a slot and adapt the limit to the latency of the computation (if one ran)"""
+        self.in_flight -= 1
         
-        for i, demand in enumerate(predictions):
-            month_date = current_date + timedelta(days=30 * i)
+        if computed:
+            now = time.time()
+            latency = now - started_at
             
-            data_point = {
-                "month": month_date.strftime("%Y-%m"),
-                "demand_mld": round(float(demand), 2)
-            }
+            if latency <= self.target_latency:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            elif started_at >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
             
-            # Add confidence intervals (±10% as approximation)
-            if include_confidence:
-                data_point["confidence_lower"] = round(float(demand * 0.90), 2)
-                data_point["confidence_upper"] = round(float(demand * 1.10), 2)
-            
-            forecast_data.append(data_point)
-        
-        return forecast_data
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
         
-    except Exception as e:
-        logger.error(f"Model prediction error: {e}. Falling back to mock data.")
-        return generate_mock_forecast(region, months, include_confidence)
+        self._wake_waiters()
+    
+    def stats(self) -> Dict:
+        """Current admission state (for health output)"""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 2) if self.latency_ewma is not None else None,
+        }
+
+
+admission_limiter = AdaptiveConcurrencyLimiter(
+    ADMISSION_INITIAL_LIMIT,
+    ADMISSION_MIN_LIMIT,
+    ADMISSION_MAX_LIMIT,
+    ADMISSION_TARGET_LATENCY,
+    ADMISSION_BACKOFF,
+)
 
 
 # ============================================
@@ -491,13 +1154,52 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+def log_background_error(future):
+    """Done-callback that logs errors from background startup jobs"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Background startup job failed: {future.exception()!r}")
+
+
+def warm_loaders():
+    """Load the model, country index and interval table before traffic needs them"""
+    load_model()
+    get_country_index()
+    load_interval_table()
+
+
+@app.on_event("startup")
+async def restore_cache_on_startup():
+    """Warm the loaders and restore the cache snapshot in the background, then start periodic snapshots"""
+    loop = asyncio.get_running_loop()
+    for background_job in (warm_loaders, restore_cache_snapshot):
+        future = loop.run_in_executor(None, background_job)
+        future.add_done_callback(log_background_error)
+    app.state.snapshot_task = asyncio.create_task(periodic_cache_snapshot())
+
+
+@app.on_event("shutdown")
+async def save_cache_on_shutdown():
+    """Snapshot the cache on graceful shutdown"""
+    snapshot_task = getattr(app.state, 'snapshot_task', None)
+    if snapshot_task:
+        snapshot_task.cancel()
+    
+    try:
+        save_cache_snapshot()
+    except Exception as e:
+        logger.error(f"Error saving cache snapshot: {e}")
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    model = load_model()
+    """Health check endpoint (reports loader state without triggering a load)"""
+    model = load_model.peek()
+    interval_table = load_interval_table.peek()
     return {
         "status": "healthy",
         "model_loaded": model is not None,
+        "intervals": interval_table['source'] if interval_table else None,
+        "admission": admission_limiter.stats(),
         "timestamp": datetime.now().isoformat(),
         "version": "1.0.0"
     }
@@ -512,59 +1214,47 @@ async def forecast_demand(request: ForecastRequest):
         ForecastResponse with predicted demand values
         
     Raises:
-        HTTPException: 400 for invalid input, 500 for server errors
+        HTTPException: 400 for invalid input, 503 when overloaded, 500 for server errors
     """
     try:
         # Check cache
-        cache_key = get_cache_key(request.region, request.months_ahead)
-        cached_result = cache_store.get(cache_key)
+        cache_key = get_cache_key(
+            request.region,
+            request.months_ahead,
+            request.confidence_level,
+            request.include_confidence,
+            request.features
+        )
         
-        if cached_result and time.time() - cached_result['timestamp'] < CACHE_TTL:
+        # Serve cache hits straight away - they never wait for admission
+        cached_result = get_cached_forecast(cache_key)
+        if cached_result:
             logger.info(f"Cache hit for {request.region} ({cache_key})")
-            return cached_result['data']
-        
-        # Load model
-        model = load_model()
+            return cached_result
         
-        # Generate predictions
-        if model:
-            forecast_data = predict_with_model(
-                model,
-                request.region,
-                request.months_ahead,
-                request.include_confidence,
-                request.features
-            )
-        else:
-            logger.warning("Using mock predictions (model not loaded)")
-            forecast_data = generate_mock_forecast(
-                request.region,
-                request.months_ahead,
-                request.include_confidence
+        if not await admission_limiter.acquire(ADMISSION_MAX_WAIT):
+            logger.warning(f"Shedding forecast for {request.region}: {admission_limiter.stats()}")
+            raise HTTPException(
+                status_code=503,
+                detail="Server is overloaded. Please retry shortly.",
+                headers={"Retry-After": "1"}
             )
         
-        # Build response
-        response = ForecastResponse(
-            region=request.region,
-            forecast=forecast_data,
-            model_version="1.0.0",
-            generated_at=datetime.now().isoformat(),
-            confidence_level=0.95,
-            metadata={
-                "months_forecasted": request.months_ahead,
-                "features_used": list(request.features.keys()) if request.features else [],
-                "cached": False
-            }
-        )
-        
-        # Cache result
-        cache_store[cache_key] = {
-            'timestamp': time.time(),
-            'data': response
-        }
+        start_time = time.time()
+        computed = False
+        try:
+            # Another request may have filled the cache while this one queued
+            response = get_cached_forecast(cache_key)
+            if response is None:
+                computed = True
+                response = await run_in_threadpool(compute_forecast, request, cache_key)
+        finally:
+            admission_limiter.release(start_time, computed)
         
         return response
         
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -573,6 +1263,96 @@ async def forecast_demand(request: ForecastRequest):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.post("/api/admin/ingest")
+def ingest_observations(request: IngestRequest, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Append new observations for specific countries without a restart
+    
+    Only the affected countries are rebuilt in memory, and only cached
+    forecasts for those countries are invalidated. Sync so FastAPI runs the
+    file write and refits in the threadpool, off the event loop.
+    
+    Raises:
+        HTTPException: 403 if the admin token is missing or wrong, 500 for server errors
+    """
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin access denied")
+    
+    try:
+        import pandas as pd
+        
+        known_countries = set(get_country_index())
+        rows = pd.DataFrame([
+            {'Country': row.country, 'Year': row.year,
+             **{column: getattr(row, key) for key, column in CSV_COLUMNS.items()}}
+            for row in request.rows
+        ])
+        
+        affected = ingest_country_rows(rows)
+        
+        # A new country may now match regions that previously fell back to defaults
+        new_countries = [key for key in affected if key not in known_countries]
+        invalidated = invalidate_cache_for_countries(affected, include_unmatched=bool(new_countries))
+        
+        return {
+            "rows_ingested": len(rows),
+            "countries_updated": [country_index[key]['name'] for key in affected],
+            "new_countries": [country_index[key]['name'] for key in new_countries],
+            "cache_entries_invalidated": invalidated
+        }
+        
+    except Exception as e:
+        logger.error(f"Ingestion error: {e}")
+        raise HTTPException(status_code=500, detail="Ingestion failed. The dataset was not changed.")
+
+
+@app.get("/api/history/{region}")
+def get_history(
+    region: str,
+    start_year: Optional[int] = Query(default=None, ge=1900, le=2100, description="First year (inclusive)"),
+    end_year: Optional[int] = Query(default=None, ge=1900, le=2100, description="Last year (inclusive)"),
+    columns: Optional[str] = Query(default=None, description="Comma-separated columns (default: all)"),
+    max_points: Optional[int] = Query(default=None, ge=1, le=1000, description="Downsample to at most this many points by bucket means")
+):
+    """
+    Historical consumption time series for one or more regions
+    (sync so FastAPI runs it in the threadpool - the index may still be loading)
+    
+    `region` may be a comma-separated list (e.g. "India,China"). Series are
+    returned column-wise: one list of years plus one list per column.
+    `max_points` averages consecutive years so long ranges stay compact.
+    
+    Raises:
+        HTTPException: 400 for invalid input, 404 for unknown regions
+    """
+    regions = [name.strip() for name in region.split(',') if name.strip()]
+    if not regions or len(regions) > HISTORY_MAX_REGIONS:
+        raise HTTPException(status_code=400, detail=f"Request between 1 and {HISTORY_MAX_REGIONS} regions")
+    
+    if start_year is not None and end_year is not None and start_year > end_year:
+        raise HTTPException(status_code=400, detail="start_year must not be after end_year")
+    
+    selected = tuple(CSV_COLUMNS) if columns is None else tuple(
+        column.strip() for column in columns.split(',') if column.strip()
+    )
+    unknown_columns = [column for column in selected if column not in CSV_COLUMNS]
+    if not selected or unknown_columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown columns: {unknown_columns}. Available: {list(CSV_COLUMNS)}"
+        )
+    
+    country_keys = [resolve_country(name) for name in regions]
+    missing = [name for name, key in zip(regions, country_keys) if key is None]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"No historical data for: {missing}")
+    
+    return {
+        "columns": list(selected),
+        "series": [get_history_slice(key, start_year, end_year, selected, max_points) for key in country_keys]
+    }
+
+
 @app.get("/api/regions")
 async def get_available_regions():
     """Get list of available regions for forecasting"""
@@ -7,6 +7,33 @@ import pickle
 import sys
 from pathlib import Path
 
+
+def export_interval_table(y_true, y_pred, horizons, scarcity_levels, path='water_demand_intervals.pkl'):
+    """
+    Save empirical residual quantiles next to the model so the API can serve
+    real prediction intervals with a table lookup instead of extra models.
+    
+    Args:
+        y_true: actual values of the held-out set
+        y_pred: model predictions for the same rows
+        horizons: years between each row and the last training year
+        scarcity_levels: Water Scarcity Level of each row (Low=0, Moderate=1, High=2)
+        path: output file (place it in ml-backend/models/)
+    """
+    import numpy as np
+    
+    sys.path.insert(0, str(Path(__file__).parent))
+    from intervals import build_interval_table
+    
+    residuals = np.asarray(y_true, dtype=float) / np.asarray(y_pred, dtype=float) - 1
+    table = build_interval_table(residuals, horizons, scarcity_levels)
+    
+    with open(path, 'wb') as f:
+        pickle.dump(table, f)
+    
+    print(f"✅ Interval table saved: {path} ({len(residuals)} residuals)")
+    return table
+
 def export_model():
     """
     Instructions to export your model:
@@ -49,12 +76,23 @@ with open('water_demand_model.pkl', 'wb') as f:
     
 print(f"✅ Model saved: {type(MODEL_VARIABLE)}")
 print(f"📦 File: water_demand_model.pkl")
+
+# Prediction intervals: residual quantiles on the held-out years
+sys.path.insert(0, '..')
+from export_model import export_interval_table
+
+export_interval_table(
+    y_test,
+    MODEL_VARIABLE.predict(X_test),
+    horizons=test_data['Year'] - train_data['Year'].max(),
+    scarcity_levels=test_data['Water Scarcity Level'].map({'Low': 0, 'Moderate': 1, 'High': 2}),
+)
 """
     
     print(code)
-    print("\n3. Run that cell to create the .pkl file")
+    print("\n3. Run that cell to create the .pkl files")
     print("\n4. Verify the file exists:")
-    print("   ls ml-backend/models/water_demand_model.pkl")
+    print("   ls ml-backend/models/water_demand_model.pkl ml-backend/models/water_demand_intervals.pkl")
     print("\n5. Test loading:")
     
     test_code = """
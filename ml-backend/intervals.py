@@ -0,0 +1,51 @@
+"""
+Prediction interval tables shared by the API and the model export helper.
+Kept free of web-server imports so it can be used from the training notebook.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+# Water Scarcity Level labels as numeric levels (matches the model features)
+SCARCITY_LEVELS = {'High': 2.0, 'Moderate': 1.0, 'Low': 0.0}
+
+# Quantile grid and binning for the residual tables
+INTERVAL_QUANTILES = np.linspace(0.005, 0.995, 199)
+INTERVAL_MAX_HORIZON = 5  # years
+INTERVAL_MIN_SAMPLES = 10  # per horizon/scarcity cell before pooling across scarcity levels
+
+
+def build_interval_table(residuals, horizons, scarcity_levels, max_horizon: int = INTERVAL_MAX_HORIZON) -> Dict:
+    """
+    Build an interval lookup table from relative residuals (actual / predicted - 1).
+    
+    Returns quantiles of the residuals on the INTERVAL_QUANTILES grid for every
+    horizon (1..max_horizon years) and scarcity level. Cells with too few samples
+    are pooled across scarcity levels; horizons without samples reuse the nearest
+    available horizon, widened by sqrt(h / h_nearest).
+    """
+    residuals = np.asarray(residuals, dtype=float)
+    horizons = np.asarray(horizons, dtype=int)
+    scarcity_levels = np.rint(np.asarray(scarcity_levels, dtype=float)).astype(int)
+    
+    levels = np.array(sorted(SCARCITY_LEVELS.values()), dtype=int)
+    available = np.unique(horizons)
+    table = np.empty((max_horizon, len(levels), len(INTERVAL_QUANTILES)))
+    
+    for h in range(1, max_horizon + 1):
+        nearest = available[np.argmin(np.abs(available - h))]
+        scale = np.sqrt(h / nearest)
+        in_horizon = horizons == nearest
+        pooled = np.quantile(residuals[in_horizon], INTERVAL_QUANTILES)
+        
+        for s_idx, level in enumerate(levels):
+            cell = residuals[in_horizon & (scarcity_levels == level)]
+            quantiles = np.quantile(cell, INTERVAL_QUANTILES) if len(cell) >= INTERVAL_MIN_SAMPLES else pooled
+            table[h - 1, s_idx] = quantiles * scale
+    
+    return {
+        'quantiles': INTERVAL_QUANTILES,
+        'scarcity_levels': levels,
+        'residuals': table,
+    }